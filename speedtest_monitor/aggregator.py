@@ -6,11 +6,12 @@ Responsible for:
 - Building aggregated reports based on configuration and timeouts.
 """
 
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from typing import Dict, List, Optional
 
 from speedtest_monitor import get_logger
-from speedtest_monitor.config import Config
+from speedtest_monitor.config import Config, NodeMetaConfig
 from speedtest_monitor.models import (
     AggregatedReport,
     NodeAggregatedStatus,
@@ -33,8 +34,12 @@ class Aggregator:
         """
         self.config = config
         self.last_results: Dict[str, SpeedtestResult] = {}
-        self.last_updated_at: Dict[str, datetime] = {}
+        # time.monotonic() of each node's last result; only used for timeouts
+        self.last_updated_at: Dict[str, float] = {}
         self._logged_unknown_nodes = set()
+        # Display metadata per node id, built once and shared by reports (it is frozen).
+        # Filled lazily because unconfigured nodes can appear at runtime.
+        self._display_meta: Dict[str, NodeDisplayMeta] = {}
 
     def update_node_result(self, result: SpeedtestResult) -> None:
         """
@@ -56,7 +61,28 @@ class Aggregator:
                 self._logged_unknown_nodes.add(result.node_id)
 
         self.last_results[result.node_id] = result
-        self.last_updated_at[result.node_id] = datetime.now()
+        self.last_updated_at[result.node_id] = time.monotonic()
+
+    def _get_display_meta(
+        self, node_id: str, nodes_meta: Dict[str, NodeMetaConfig]
+    ) -> NodeDisplayMeta:
+        """
+        Get display metadata for a node, reusing it across reports.
+
+        Args:
+            node_id: Node identifier.
+            nodes_meta: Configured node metadata (master.nodes_meta).
+        """
+        display_meta = self._display_meta.get(node_id)
+        if display_meta is None:
+            meta_config = nodes_meta.get(node_id)
+            display_meta = NodeDisplayMeta(
+                node_id=node_id,
+                flag=meta_config.flag if meta_config else None,
+                display_name=meta_config.display_name if meta_config else None,
+            )
+            self._display_meta[node_id] = display_meta
+        return display_meta
 
     def build_report(self) -> AggregatedReport:
         """
@@ -91,17 +117,12 @@ class Aggregator:
         remaining_nodes = sorted(list(all_node_ids - set(ordered_nodes)))
         ordered_nodes.extend(remaining_nodes)
 
-        now = datetime.now()
-        timeout_delta = timedelta(minutes=self.config.master.node_timeout_minutes)
+        now = time.monotonic()
+        timeout_sec = self.config.master.node_timeout_minutes * 60.0
 
         for node_id in ordered_nodes:
             # Get metadata
-            meta_config = self.config.master.nodes_meta.get(node_id)
-            display_meta = NodeDisplayMeta(
-                node_id=node_id,
-                flag=meta_config.flag if meta_config else None,
-                display_name=meta_config.display_name if meta_config else None,
-            )
+            display_meta = self._get_display_meta(node_id, self.config.master.nodes_meta)
 
             last_result = self.last_results.get(node_id)
             last_update = self.last_updated_at.get(node_id)
@@ -109,9 +130,9 @@ class Aggregator:
             is_online = False
             derived_status = "offline"
 
-            if last_result and last_update:
+            if last_result and last_update is not None:
                 # Check timeout
-                if now - last_update <= timeout_delta:
+                if now - last_update <= timeout_sec:
                     is_online = True
                     # Map speedtest status to aggregated status
                     if last_result.status in ["excellent", "good", "normal"]:
@@ -145,7 +166,7 @@ class Aggregator:
             )
 
         return AggregatedReport(
-            generated_at=now,
+            generated_at=datetime.now(),
             nodes=nodes_status,
             summary=summary,
         )
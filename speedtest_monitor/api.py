@@ -61,7 +61,8 @@ class APIServer:
         return web.json_response({
             "status": "ok",
             "mode": "master",
-            "version": "1.0.0"  # Ideally import __version__ from main or init
+            "version": "1.0.0",  # Ideally import __version__ from main or init
+            "telegram": dict(self.notifier.delivery_stats),
         })
 
     async def start_background_tasks(self, app):
@@ -110,7 +111,8 @@ class APIServer:
                 await self.master_speedtest_task
             except asyncio.CancelledError:
                 pass
-                
+
+        await self.notifier.close()
         logger.info("Background tasks stopped")
 
     async def master_speedtest_loop(self):
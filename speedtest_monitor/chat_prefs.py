@@ -4,14 +4,24 @@ Chat preferences storage module.
 Manages per-chat settings (language, view mode) using SQLite.
 """
 
+import atexit
 import sqlite3
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterable, Optional
 
 DB_PATH = Path("chat_prefs.db")
 
+# Buffered preference changes not yet written to the database: {chat_id: {column: value}}.
+# Reads apply them on top of stored rows; flush_pending_writes() persists them.
+_pending_writes: Dict[int, Dict[str, Any]] = {}
+_pending_lock = threading.Lock()
+# Serializes flushes; the database I/O runs without holding _pending_lock
+_flush_lock = threading.Lock()
+_flush_registered = False
+
 
 @dataclass
 class ChatPreferences:
@@ -56,50 +66,156 @@ def get_chat_preferences(chat_id: int) -> Optional[ChatPreferences]:
             (chat_id,),
         )
         row = cursor.fetchone()
-        if row:
-            return ChatPreferences(
-                chat_id=row[0],
-                language=row[1],
-                view_mode=row[2],
-                created_at=datetime.fromisoformat(row[3]),
-                updated_at=datetime.fromisoformat(row[4]),
-            )
-    return None
+    return _apply_pending(chat_id, _row_to_preferences(row) if row else None)
+
+
+def get_chat_preferences_bulk(chat_ids: Iterable[int]) -> Dict[int, ChatPreferences]:
+    """
+    Get preferences for several chats with a single query.
+
+    Args:
+        chat_ids: Telegram chat IDs
+
+    Returns:
+        Mapping of chat ID to ChatPreferences; chats without a record are omitted
+    """
+    chat_ids = list(chat_ids)
+    if not chat_ids:
+        return {}
+
+    _init_db()
+    placeholders = ", ".join("?" * len(chat_ids))
+    with sqlite3.connect(DB_PATH) as conn:
+        cursor = conn.execute(
+            "SELECT chat_id, language, view_mode, created_at, updated_at FROM chat_prefs "
+            f"WHERE chat_id IN ({placeholders})",
+            chat_ids,
+        )
+        stored = {row[0]: _row_to_preferences(row) for row in cursor}
+
+    result = {}
+    for chat_id in chat_ids:
+        prefs = _apply_pending(chat_id, stored.get(chat_id))
+        if prefs:
+            result[chat_id] = prefs
+    return result
+
+
+def _row_to_preferences(row) -> ChatPreferences:
+    """Internal helper to build ChatPreferences from a chat_prefs row."""
+    return ChatPreferences(
+        chat_id=row[0],
+        language=row[1],
+        view_mode=row[2],
+        created_at=datetime.fromisoformat(row[3]),
+        updated_at=datetime.fromisoformat(row[4]),
+    )
+
+
+def _apply_pending(chat_id: int, prefs: Optional[ChatPreferences]) -> Optional[ChatPreferences]:
+    """Internal helper to overlay buffered changes on stored preferences."""
+    with _pending_lock:
+        pending = _pending_writes.get(chat_id)
+        if not pending:
+            return prefs
+        pending = dict(pending)
+    if prefs is None:
+        # Same fallback defaults as _write_pref uses for a missing row
+        prefs = ChatPreferences(
+            chat_id=chat_id,
+            language="en",
+            view_mode="compact",
+            created_at=pending["updated_at"],
+            updated_at=pending["updated_at"],
+        )
+    return replace(prefs, **pending)
+
+
+def set_chat_language(chat_id: int, language: str, buffered: bool = False) -> None:
+    """Update chat language (see _set_pref for buffered writes)."""
+    _set_pref(chat_id, "language", language, buffered)
 
 
-def set_chat_language(chat_id: int, language: str) -> None:
-    """Update chat language."""
-    _update_pref(chat_id, "language", language)
+def set_chat_view_mode(chat_id: int, view_mode: str, buffered: bool = False) -> None:
+    """Update chat view mode (see _set_pref for buffered writes)."""
+    _set_pref(chat_id, "view_mode", view_mode, buffered)
+
+
+def _set_pref(chat_id: int, column: str, value: str, buffered: bool) -> None:
+    """
+    Internal helper to write a preference now or buffer it for flush_pending_writes().
 
+    Buffered changes are visible to reads immediately and are flushed at exit
+    at the latest, so bursts of changes cost one database transaction.
+    """
+    if not buffered:
+        _update_pref(chat_id, column, value)
+        return
+
+    global _flush_registered
+    with _pending_lock:
+        _pending_writes.setdefault(chat_id, {}).update({column: value, "updated_at": datetime.now()})
+        if not _flush_registered:
+            atexit.register(flush_pending_writes)
+            _flush_registered = True
+
+
+def flush_pending_writes() -> None:
+    """
+    Write all buffered preference changes to the database in one transaction.
 
-def set_chat_view_mode(chat_id: int, view_mode: str) -> None:
-    """Update chat view mode."""
-    _update_pref(chat_id, "view_mode", view_mode)
+    The changes are copied under the lock and written without it, so callers
+    buffering or reading preferences never wait on the database. Entries stay
+    buffered (and visible to reads) until written, and an entry changed during
+    the write is kept for the next flush.
+    """
+    with _flush_lock:
+        with _pending_lock:
+            batch = {chat_id: dict(changes) for chat_id, changes in _pending_writes.items()}
+        if not batch:
+            return
+
+        _init_db()
+        with sqlite3.connect(DB_PATH) as conn:
+            for chat_id, changes in batch.items():
+                now = changes["updated_at"]
+                for column, value in changes.items():
+                    if column != "updated_at":
+                        _write_pref(conn, chat_id, column, value, now)
+
+        with _pending_lock:
+            for chat_id, changes in batch.items():
+                if _pending_writes.get(chat_id) == changes:
+                    del _pending_writes[chat_id]
 
 
 def _update_pref(chat_id: int, column: str, value: str) -> None:
     """Internal helper to update a single preference column."""
     _init_db()
-    now = datetime.now()
     with sqlite3.connect(DB_PATH) as conn:
-        # Check if exists
-        cursor = conn.execute("SELECT 1 FROM chat_prefs WHERE chat_id = ?", (chat_id,))
-        if cursor.fetchone():
-            conn.execute(
-                f"UPDATE chat_prefs SET {column} = ?, updated_at = ? WHERE chat_id = ?",
-                (value, now.isoformat(), chat_id),
-            )
-        else:
-            # Should be created via ensure_default_preferences first, but handle safe fallback
-            defaults = {
-                "language": "en",
-                "view_mode": "compact",
-                column: value
-            }
-            conn.execute(
-                "INSERT INTO chat_prefs (chat_id, language, view_mode, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
-                (chat_id, defaults["language"], defaults["view_mode"], now.isoformat(), now.isoformat()),
-            )
+        _write_pref(conn, chat_id, column, value, datetime.now())
+
+
+def _write_pref(conn: sqlite3.Connection, chat_id: int, column: str, value: str, now: datetime) -> None:
+    """Internal helper to update a single preference column on an open connection."""
+    # Check if exists
+    cursor = conn.execute("SELECT 1 FROM chat_prefs WHERE chat_id = ?", (chat_id,))
+    if cursor.fetchone():
+        conn.execute(
+            f"UPDATE chat_prefs SET {column} = ?, updated_at = ? WHERE chat_id = ?",
+            (value, now.isoformat(), chat_id),
+        )
+    else:
+        # Should be created via ensure_default_preferences first, but handle safe fallback
+        defaults = {
+            "language": "en",
+            "view_mode": "compact",
+            column: value
+        }
+        conn.execute(
+            "INSERT INTO chat_prefs (chat_id, language, view_mode, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (chat_id, defaults["language"], defaults["view_mode"], now.isoformat(), now.isoformat()),
+        )
 
 
 def ensure_default_preferences(chat_id: int, defaults: ChatPreferences) -> ChatPreferences:
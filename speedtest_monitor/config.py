@@ -218,6 +218,8 @@ def load_config(config_path: Path) -> Config:
             check_interval=telegram_yaml.get("check_interval", 3600),
             send_always=telegram_yaml.get("send_always", False),
             format=telegram_yaml.get("format", "html"),
+            language=telegram_yaml.get("language", "ru"),
+            message_style=telegram_yaml.get("message_style", "detailed"),
         )
 
         # Parse Master configuration
@@ -325,10 +327,19 @@ def validate_config(config: Config) -> None:
     if not all(t > 0 for t in thresholds):
         raise ConfigurationError("All thresholds must be positive")
 
+    if thresholds != sorted(thresholds):
+        raise ConfigurationError("Thresholds must be ascending: very_low <= low <= medium <= good")
+
     # Validate Telegram format
     if config.telegram.format not in ["html", "markdown"]:
         raise ConfigurationError("Telegram format must be 'html' or 'markdown'")
 
+    if config.telegram.language not in ["ru", "en"]:
+        raise ConfigurationError("Telegram language must be 'ru' or 'en'")
+
+    if config.telegram.message_style not in ["compact", "detailed"]:
+        raise ConfigurationError("Telegram message_style must be 'compact' or 'detailed'")
+
     # Validate logging level
     valid_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
     if config.logging.level.upper() not in valid_levels:
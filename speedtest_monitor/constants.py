@@ -8,7 +8,14 @@ throughout the codebase.
 MAX_MESSAGE_LENGTH = 4096
 TELEGRAM_API_TIMEOUT = 30
 TELEGRAM_RETRY_COUNT = 3
-TELEGRAM_RETRY_DELAY = 2  # seconds
+TELEGRAM_RETRY_DELAY = 2  # seconds, doubled after each failed attempt
+TELEGRAM_RETRY_MAX_DELAY = 30  # seconds
+TELEGRAM_RETRY_JITTER = 0.5  # seconds
+CALLBACK_RENDER_CACHE_SIZE = 1024  # messages tracked for callback debouncing
+REPORT_RENDER_CACHE_SIZE = 16  # rendered master reports kept per notifier
+TELEGRAM_POLLING_TIMEOUT = 60  # seconds, long-poll wait for getUpdates
+TELEGRAM_MAX_CONCURRENT_SENDS = 30  # parallel sendMessage calls during fan-out
+CHAT_PREFS_FLUSH_DELAY = 0.2  # seconds, coalesces preference writes from button taps
 
 # Speedtest Configuration
 DEFAULT_TIMEOUT = 60
@@ -21,6 +28,8 @@ IPAPI_URL = "https://ipapi.co/{ip}/json/"
 IPIFY_URL = "https://api.ipify.org"
 API_TIMEOUT = 5
 API_RETRY_COUNT = 2
+LOOKUP_CACHE_TTL = 86400  # seconds, public IP / location lookups
+LOOKUP_CACHE_PATH = "~/.cache/speedtest_monitor/location.json"
 
 # Logging
 DEFAULT_LOG_LEVEL = "INFO"
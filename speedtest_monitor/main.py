@@ -369,7 +369,7 @@ def main():
         try:
             if notifier:
                 # Close any open connections
-                pass
+                notifier.close_sync()
             if runner:
                 # Cleanup runner resources
                 pass
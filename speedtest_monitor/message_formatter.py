@@ -5,13 +5,16 @@ Handles formatting of Telegram messages for all modes (single, master, node)
 and styles (compact, detailed) with localization support.
 """
 
-from datetime import datetime
-from typing import Dict, Optional, Any, Tuple, Union
+import time
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
 
 from speedtest_monitor.models import SpeedtestResult as ModelSpeedtestResult, AggregatedReport
 from speedtest_monitor.speedtest_runner import SpeedtestResult as RunnerSpeedtestResult
 from speedtest_monitor.utils import format_speed, format_ping, get_system_info
 
+# Timestamp format for single-result messages
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
 # Localization strings
 STRINGS = {
     "en": {
@@ -72,6 +75,22 @@ STRINGS = {
     },
 }
 
+# Per-language strings with English filled in for missing keys, so lookups need no fallback chain
+_FLAT_STRINGS = {lang: {**STRINGS["en"], **strings} for lang, strings in STRINGS.items()}
+
+# Single-result results/status block per language, with the labels already filled in
+_RESULTS_BLOCK_TMPL = {
+    lang: (
+        f"📶 <b>{strings['results']}:</b>\n"
+        f"⬇️ <b>{strings['download']}:</b> {{dl}}\n"
+        f"⬆️ <b>{strings['upload']}:</b> {{ul}}\n"
+        f"📡 <b>{strings['ping']}:</b> {{ping}}\n"
+        "\n"
+        f"📈 <b>{strings['status']}:</b> {{emoji}} {{text}}\n"
+    ).format
+    for lang, strings in _FLAT_STRINGS.items()
+}
+
 # Default emojis for statuses
 STATUS_EMOJIS = {
     "very_low": "🚨❌",
@@ -85,6 +104,22 @@ STATUS_EMOJIS = {
     "unknown": "❓",
 }
 
+# Per-node blocks of the detailed master report (each ends with a blank separator line)
+_DETAILED_NODE_TMPL = (
+    "🔹 <b>{flag} {name}</b>\n"
+    "{description}"
+    "   ⬇️ {dl} | ⬆️ {ul} | 📡 {ping}\n"
+    "   📈 {emoji} {text}\n"
+)
+_DETAILED_OFFLINE_TMPL = "🔹 <b>{flag} {name}</b>\n   🔴 {offline}\n"
+# Aggregator-derived statuses that replace a node's own status in compact lines
+_DERIVED_STATUS_OVERRIDES = {"degraded": "degraded"}
+_COMPACT_LINE_TMPL = "{0} {1} — {2:.0f} / {3:.0f} Mbps, ping {4:.1f} ms — {5} {6}".format
+
+# Flattened node for master report rendering:
+# (flag, name, online, download, upload, ping, status_key, derived_status, description)
+_RenderRow = Tuple[str, str, bool, Optional[float], Optional[float], Optional[float], Optional[str], str, Optional[str]]
+
 
 class MessageFormatter:
     """
@@ -94,7 +129,7 @@ class MessageFormatter:
     @staticmethod
     def _get_string(key: str, lang: str) -> str:
         """Get localized string."""
-        return STRINGS.get(lang, STRINGS["en"]).get(key, key)
+        return _FLAT_STRINGS.get(lang, _FLAT_STRINGS["en"]).get(key, key)
 
     @staticmethod
     def _get_status_info(status_key: str, lang: str, custom_config: Optional[Any] = None) -> Tuple[str, str]:
@@ -109,24 +144,38 @@ class MessageFormatter:
         Returns:
             Tuple of (emoji, text)
         """
+        single_map, agg_map = MessageFormatter._status_override_maps(custom_config)
+        return MessageFormatter._resolve_status(status_key, lang, single_map, agg_map)
+
+    @staticmethod
+    def _status_override_maps(custom_config: Optional[Any]) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Get the (single node, aggregated) status overrides of a StatusConfig, if any."""
+        if not custom_config:
+            return None, None
+        return custom_config.single_node_statuses, custom_config.aggregated_statuses
+
+    @staticmethod
+    def _resolve_status(
+        status_key: str,
+        lang: str,
+        single_map: Optional[Dict],
+        agg_map: Optional[Dict]
+    ) -> Tuple[str, str]:
+        """Get emoji and localized text for a status, given pre-resolved override maps."""
         emoji = STATUS_EMOJIS.get(status_key, STATUS_EMOJIS["unknown"])
         text = MessageFormatter._get_string(f"status_{status_key}", lang)
 
-        # Override from config if available
-        if custom_config:
-            # Check single node statuses
-            if custom_config.single_node_statuses and status_key in custom_config.single_node_statuses:
-                cfg = custom_config.single_node_statuses[status_key]
-                emoji = cfg.emoji
-                if cfg.label.get(lang):
-                    text = cfg.label.get(lang)
-            # Check aggregated statuses
-            elif custom_config.aggregated_statuses and status_key in custom_config.aggregated_statuses:
-                cfg = custom_config.aggregated_statuses[status_key]
-                emoji = cfg.emoji
-                if cfg.label.get(lang):
-                    text = cfg.label.get(lang)
+        # Override from config if available: single node statuses first, then aggregated
+        if single_map and status_key in single_map:
+            cfg = single_map[status_key]
+        elif agg_map and status_key in agg_map:
+            cfg = agg_map[status_key]
+        else:
+            return emoji, text
 
+        emoji = cfg.emoji
+        if cfg.label.get(lang):
+            text = cfg.label.get(lang)
         return emoji, text
 
     @staticmethod
@@ -136,10 +185,14 @@ class MessageFormatter:
         lang: str = "ru",
         server_info: Optional[Dict[str, str]] = None,
         status_config: Optional[Any] = None,
-        status_key: str = "unknown"
+        status_key: str = "unknown",
+        system_info: Optional[Dict[str, str]] = None
     ) -> str:
         """
         Format a single speedtest result (Single Mode).
+
+        system_info may be passed by callers that already hold it; otherwise
+        it is looked up via get_system_info().
         """
         s = lambda k: MessageFormatter._get_string(k, lang)
         
@@ -152,47 +205,20 @@ class MessageFormatter:
         server_id = server_info.get("id", "Unknown") if server_info else "Unknown"
         desc = server_info.get("description", "") if server_info else ""
         
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        system_info = get_system_info()
+        timestamp = time.strftime(_TS_FMT)
+        if system_info is None:
+            system_info = get_system_info()
 
-        # Error Handling
-        if not result.success:
-            msg = [
-                f"<b>{header}</b>",
-                "",
-                f"🖥 <b>{s('server')}:</b> {server_name} ({server_loc})",
-            ]
-            if desc:
-                msg.append(f"📝 <b>{s('desc')}:</b> {desc}")
-            
-            msg.extend([
-                f"🆔 <b>{s('id')}:</b> {server_id}",
-                f"🕐 <b>{s('time')}:</b> {timestamp}",
-                "",
-                f"❌ <b>{s('error')}:</b> {result.error_message or 'Unknown error'}",
-            ])
-            
-            # Add OS info at the bottom
-            msg.extend([
-                "",
-                f"💻 <b>{s('os')}:</b> {system_info['os']} {system_info['os_version']}"
-            ])
-            
-            return "\n".join(msg)
-
-        # Success Handling
-        emoji, status_text = MessageFormatter._get_status_info(status_key, lang, status_config)
-
-        if style == "compact":
-            # Truly compact mode: Header + Results + Status
-            msg = [
+        # Success Handling (compact): Header + Results + Status
+        if result.success and style == "compact":
+            emoji, status_text = MessageFormatter._get_status_info(status_key, lang, status_config)
+            return "\n".join([
                 f"<b>{header}</b>",
                 f"⬇️ {format_speed(result.download_mbps)} | ⬆️ {format_speed(result.upload_mbps)} | 📡 {format_ping(result.ping_ms)}",
                 f"{emoji} {status_text}"
-            ]
-            return "\n".join(msg)
+            ])
 
-        # Detailed mode
+        # Server block shared by error and detailed messages
         msg = [
             f"<b>{header}</b>",
             "",
@@ -200,95 +226,145 @@ class MessageFormatter:
         ]
         if desc:
             msg.append(f"📝 <b>{s('desc')}:</b> {desc}")
-            
-        msg.extend([
-            f"🆔 <b>{s('id')}:</b> {server_id}",
-            f"🕐 <b>{s('time')}:</b> {timestamp}",
-            "",
-        ])
+        msg.append(f"🆔 <b>{s('id')}:</b> {server_id}")
+        msg.append(f"🕐 <b>{s('time')}:</b> {timestamp}")
+        msg.append("")
+
+        # Error Handling
+        if not result.success:
+            msg.append(f"❌ <b>{s('error')}:</b> {result.error_message or 'Unknown error'}")
+            # Add OS info at the bottom
+            msg.append("")
+            msg.append(f"💻 <b>{s('os')}:</b> {system_info['os']} {system_info['os_version']}")
+            return "\n".join(msg)
+
+        # Detailed mode
+        emoji, status_text = MessageFormatter._get_status_info(status_key, lang, status_config)
+        # Results and status as one block; the trailing newline leaves a blank line after it
+        results_block = _RESULTS_BLOCK_TMPL.get(lang, _RESULTS_BLOCK_TMPL["en"])
+        msg.append(results_block(
+            dl=format_speed(result.download_mbps),
+            ul=format_speed(result.upload_mbps),
+            ping=format_ping(result.ping_ms),
+            emoji=emoji,
+            text=status_text,
+        ))
 
-        msg.extend([
-            f"📶 <b>{s('results')}:</b>",
-            f"⬇️ <b>{s('download')}:</b> {format_speed(result.download_mbps)}",
-            f"⬆️ <b>{s('upload')}:</b> {format_speed(result.upload_mbps)}",
-            f"📡 <b>{s('ping')}:</b> {format_ping(result.ping_ms)}",
-            "",
-            f"📈 <b>{s('status')}:</b> {emoji} {status_text}",
-            ""
-        ])
-        
         if result.server_location:
             msg.append(f"🌐 <b>{s('test_server')}:</b> {result.server_location}")
         if result.isp:
             msg.append(f"🏢 <b>{s('isp')}:</b> {result.isp}")
-            
+
         msg.append(f"💻 <b>{s('os')}:</b> {system_info['os']} {system_info['os_version']}")
 
         return "\n".join(msg)
 
+    @staticmethod
+    def extract_render_rows(report: AggregatedReport) -> List[_RenderRow]:
+        """
+        Flatten report nodes into the plain values the master report needs.
+
+        One pass does all attribute access, so the format loops only format.
+        Offline nodes (or nodes without a result) carry None for the result fields.
+        """
+        rows: List[_RenderRow] = []
+        for node in report.nodes:
+            meta = node.meta
+            flag = meta.flag or "🛰️"
+            name = meta.display_name or meta.node_id
+            result = node.last_result
+            if node.is_online and result:
+                rows.append((
+                    flag, name, True,
+                    result.download_mbps, result.upload_mbps, result.ping_ms,
+                    result.status or "ok", node.derived_status, result.description,
+                ))
+            else:
+                rows.append((flag, name, False, None, None, None, None, node.derived_status, None))
+        return rows
+
+    @staticmethod
+    def _format_compact_line(
+        row: _RenderRow,
+        status_info: Callable[[str], Tuple[str, str]],
+        offline_text: str
+    ) -> str:
+        """Format one node line of the compact master report."""
+        flag, name, online, dl, ul, ping, status_key, derived_status, _ = row
+
+        # Result fields are None only on offline rows (see extract_render_rows)
+        if not online or status_key is None:
+            return f"{flag} {name} — {offline_text} 🔴"
+
+        # Override the node's own status if aggregator thinks it's degraded
+        status_key = _DERIVED_STATUS_OVERRIDES.get(derived_status, status_key)
+
+        emoji, text = status_info(status_key)
+        return _COMPACT_LINE_TMPL(flag, name, dl, ul, ping, emoji, text)
+
+    @staticmethod
+    def _format_detailed_block(
+        row: _RenderRow,
+        status_info: Callable[[str], Tuple[str, str]],
+        offline_text: str
+    ) -> str:
+        """Format one node block of the detailed master report."""
+        flag, name, online, dl, ul, ping, status_key, _, description = row
+
+        # Result fields are None only on offline rows (see extract_render_rows)
+        if not online or dl is None or ul is None or ping is None or status_key is None:
+            return _DETAILED_OFFLINE_TMPL.format(flag=flag, name=name, offline=offline_text)
+
+        emoji, text = status_info(status_key)
+        return _DETAILED_NODE_TMPL.format(
+            flag=flag,
+            name=name,
+            description=f"   📝 {description}\n" if description else "",
+            dl=format_speed(dl),
+            ul=format_speed(ul),
+            ping=format_ping(ping),
+            emoji=emoji,
+            text=text,
+        )
+
     @staticmethod
     def format_master_report(
         report: AggregatedReport,
         style: str = "compact",
         lang: str = "ru",
-        status_config: Optional[Any] = None
+        status_config: Optional[Any] = None,
+        rows: Optional[List[_RenderRow]] = None
     ) -> str:
         """
         Format aggregated report (Master Mode).
+
+        rows may be passed by callers that already ran extract_render_rows(report).
         """
         s = lambda k: MessageFormatter._get_string(k, lang)
         header = s("header")
         last_hour = s("last_hour")
-        
-        msg = [f"<b>{header}</b> ({last_hour})", ""]
+        # Language is fixed for the whole report, so resolve per-node labels once
+        offline_text = s("offline")
+
+        # Status keys repeat across nodes and lang/status_config are fixed, so resolve each once
+        single_map, agg_map = MessageFormatter._status_override_maps(status_config)
+        resolved: Dict[str, Tuple[str, str]] = {}
+
+        def status_info(status_key: str) -> Tuple[str, str]:
+            info = resolved.get(status_key)
+            if info is None:
+                info = resolved[status_key] = MessageFormatter._resolve_status(
+                    status_key, lang, single_map, agg_map
+                )
+            return info
         
         if style == "compact":
-            for node in report.nodes:
-                flag = node.meta.flag or "🛰️"
-                name = node.meta.display_name or node.meta.node_id
-                
-                if node.is_online and node.last_result:
-                    dl = f"{node.last_result.download_mbps:.0f}"
-                    ul = f"{node.last_result.upload_mbps:.0f}"
-                    ping = f"{node.last_result.ping_ms:.1f}"
-                    
-                    # Determine status
-                    # Use detailed status if available, else derived
-                    status_key = node.last_result.status if node.last_result.status else "ok"
-                    if node.derived_status == "degraded":
-                        status_key = "degraded" # Override if aggregator thinks it's degraded
-                    
-                    emoji, text = MessageFormatter._get_status_info(status_key, lang, status_config)
-                    
-                    msg.append(
-                        f"{flag} {name} — {dl} / {ul} Mbps, ping {ping} ms — {emoji} {text}"
-                    )
-                else:
-                    offline_text = s("offline")
-                    msg.append(f"{flag} {name} — {offline_text} 🔴")
-        
+            format_node = MessageFormatter._format_compact_line
         else: # Detailed master report
-            # Implement if needed, for now similar to compact but maybe with more lines per node
-            for node in report.nodes:
-                flag = node.meta.flag or "🛰️"
-                name = node.meta.display_name or node.meta.node_id
-                msg.append(f"🔹 <b>{flag} {name}</b>")
-                
-                if node.is_online and node.last_result:
-                    if node.last_result.description:
-                        msg.append(f"   📝 {node.last_result.description}")
-
-                    dl = format_speed(node.last_result.download_mbps)
-                    ul = format_speed(node.last_result.upload_mbps)
-                    ping = format_ping(node.last_result.ping_ms)
-                    
-                    status_key = node.last_result.status if node.last_result.status else "ok"
-                    emoji, text = MessageFormatter._get_status_info(status_key, lang, status_config)
-                    
-                    msg.append(f"   ⬇️ {dl} | ⬆️ {ul} | 📡 {ping}")
-                    msg.append(f"   📈 {emoji} {text}")
-                else:
-                    msg.append(f"   🔴 {s('offline')}")
-                msg.append("")
+            format_node = MessageFormatter._format_detailed_block
 
-        return "\n".join(msg)
+        # Header, blank line, then one entry per node: built at its final size and joined once
+        if rows is None:
+            rows = MessageFormatter.extract_render_rows(report)
+        lines = [format_node(row, status_info, offline_text) for row in rows]
+        return "\n".join([f"<b>{header}</b> ({last_hour})", "", *lines])
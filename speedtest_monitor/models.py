@@ -7,7 +7,7 @@ This module defines the data structures used for:
 - Master-side aggregation and reporting
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -48,7 +48,7 @@ class NodeReportPayload:
     description: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True)
 class NodeDisplayMeta:
     """
     Metadata for displaying a node in reports.
@@ -80,3 +80,7 @@ class AggregatedReport:
     generated_at: datetime
     nodes: List[NodeAggregatedStatus]
     summary: Dict[str, int]  # e.g. {"ok": 4, "degraded": 1, "offline": 1}
+    nodes_by_id: Dict[str, NodeAggregatedStatus] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.nodes_by_id = {status.meta.node_id: status for status in self.nodes}
@@ -5,36 +5,114 @@ Handles sending formatted messages to Telegram.
 """
 
 import asyncio
-import time
+import atexit
+import bisect
+import random
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
 from datetime import datetime
-from typing import Optional
+from typing import Any, Awaitable, Coroutine, Dict, List, Optional, Tuple, TypeVar
 
 from aiogram import Bot, Dispatcher, F
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
-from aiogram.exceptions import TelegramAPIError
-from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
-from speedtest_monitor.chat_prefs import (
+from .chat_prefs import (
     ChatPreferences,
     ensure_default_preferences,
+    flush_pending_writes,
     get_chat_preferences,
+    get_chat_preferences_bulk,
     set_chat_language,
     set_chat_view_mode,
 )
-from .config import Config, ServerConfig, ThresholdsConfig
+from .config import Config, TelegramTargetConfig
 from .constants import (
+    CALLBACK_RENDER_CACHE_SIZE,
+    CHAT_PREFS_FLUSH_DELAY,
     MAX_MESSAGE_LENGTH,
+    REPORT_RENDER_CACHE_SIZE,
     TELEGRAM_API_TIMEOUT,
+    TELEGRAM_MAX_CONCURRENT_SENDS,
+    TELEGRAM_POLLING_TIMEOUT,
     TELEGRAM_RETRY_COUNT,
     TELEGRAM_RETRY_DELAY,
+    TELEGRAM_RETRY_JITTER,
+    TELEGRAM_RETRY_MAX_DELAY,
 )
 from .logger import get_logger
+from .message_formatter import MessageFormatter
 from .speedtest_runner import SpeedtestResult
-from .utils import get_system_info, get_location_by_ip
-from speedtest_monitor.message_formatter import MessageFormatter
+from .utils import get_location_by_ip, get_system_info, telegram_length, truncate_message
 
 logger = get_logger()
 
+_T = TypeVar("_T")
+
+# Callback data format: pref:<type>:<value>. Anything else is ignored.
+_PREF_RE = re.compile(r"pref:(lang:(?:ru|en)|view:(?:compact|detailed))")
+
+# Single-result status keys, indexed by how many thresholds the download speed reaches
+_STATUS_KEYS = ("very_low", "low", "normal", "good", "excellent")
+
+# Persistent event loop used by the sync wrapper. Keeping one loop alive for the
+# whole process lets aiohttp connection pools survive between notifications.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Get the background event loop, starting it on first use."""
+    global _loop, _thread
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+
+            def _run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.run_forever()
+
+            _thread = threading.Thread(target=_run, name="telegram-notifier-loop", daemon=True)
+            _thread.start()
+            _loop = loop
+            atexit.register(_stop_loop)
+        return _loop
+
+
+def _run_in_loop(coro: Coroutine[Any, Any, _T], timeout: float) -> _T:
+    """
+    Run a coroutine on the background loop and block until it finishes.
+
+    Works whether or not the calling thread already runs its own event loop
+    (e.g. a web handler or notebook). Calling it from the background loop
+    itself would deadlock, so that case raises instead.
+    """
+    loop = _get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("Cannot block on the notifier loop from inside it; await the coroutine instead")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        future.cancel()
+        raise
+
+
+def _stop_loop() -> None:
+    """Stop the background event loop (registered with atexit)."""
+    if _loop is not None and _loop.is_running():
+        _loop.call_soon_threadsafe(_loop.stop)
+
 
 class TelegramNotifier:
     """
@@ -54,18 +132,60 @@ class TelegramNotifier:
         self.config = config
         self.aggregator = aggregator
         self.dp = Dispatcher()
+
+        # One Bot and HTTP session (connection pool + DNS cache) shared by polling and all sends.
+        # Both are created lazily; the aiohttp ClientSession only on the first request.
+        self._session = AiohttpSession()
+        self._bot: Optional[Bot] = None
         self._setup_handlers()
+
+        # Only 4 (language, view mode) combinations exist, so build keyboards once
+        self._keyboards = {
+            (lang, view): self._build_keyboard(lang, view)
+            for lang in ("ru", "en")
+            for view in ("compact", "detailed")
+        }
+
+        # Caps parallel sends during fan-out; created on first use inside the running loop
+        self._send_semaphore: Optional[asyncio.Semaphore] = None
+
+        # Delivery counters (attempts, sent, failed, rate_limited), exposed via /health
+        self.delivery_stats: Counter = Counter()
+
+        # Chat preferences already ensured in storage, kept in sync by callbacks
+        self._chat_prefs: Dict[int, ChatPreferences] = {}
+        self._prefs_flush_task: Optional[asyncio.Task] = None
+
+        # Hash of the last (text, language, view) shown in each (chat_id, message_id), bounded LRU
+        self._last_rendered: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+
+        # Rendered master reports by (node rows, language, view mode), bounded LRU
+        self._rendered_reports: "OrderedDict[Tuple[tuple, str, str], str]" = OrderedDict()
         
         # Cache server info on initialization to avoid repeated lookups
-        self._server_name = None
-        self._server_location = None
-        self._server_identifier = None
+        self._system_info = get_system_info()
+        self._server_name: Optional[str] = None
+        self._server_location: Optional[str] = None
+        self._server_identifier: Optional[str] = None
+        self._server_info: Optional[Dict[str, str]] = None
+
+        # Ascending speed thresholds for _calculate_status_key, read from config on first use
+        self._thresholds: Optional[List[float]] = None
 
     def _setup_handlers(self):
         """Register Telegram handlers."""
         self.dp.callback_query.register(self._handle_callback, F.data.startswith("pref:"))
 
     def _get_keyboard(self, current_lang: str, current_view: str) -> InlineKeyboardMarkup:
+        """Get the precomputed inline keyboard for settings."""
+        keyboard = self._keyboards.get((current_lang, current_view))
+        if keyboard is None:
+            # Unknown combination (e.g. unsupported default_language in config)
+            keyboard = self._build_keyboard(current_lang, current_view)
+        return keyboard
+
+    @staticmethod
+    def _build_keyboard(current_lang: str, current_view: str) -> InlineKeyboardMarkup:
         """Generate inline keyboard for settings."""
         # Language buttons
         lang_ru = "✅ 🌐 ru" if current_lang == "ru" else "🌐 ru"
@@ -93,68 +213,181 @@ class TelegramNotifier:
             if not callback.data or not callback.message:
                 return
 
-            # data format: pref:type:value
-            parts = callback.data.split(":")
-            if len(parts) != 3:
+            match = _PREF_RE.fullmatch(callback.data)
+            if not match:
                 return
-                
-            _, pref_type, value = parts
+
+            pref_type, _, value = match.group(1).partition(":")
             chat_id = callback.message.chat.id
-            
-            if pref_type == "lang":
-                set_chat_language(chat_id, value)
-            elif pref_type == "view":
-                set_chat_view_mode(chat_id, value)
-            
-            # Re-render report if aggregator is available
-            if self.aggregator:
+
+            # Skip the write when the tapped option is already active
+            prefs = get_chat_preferences(chat_id)
+            current = None
+            if prefs:
+                current = prefs.language if pref_type == "lang" else prefs.view_mode
+            if value != current:
+                if pref_type == "lang":
+                    set_chat_language(chat_id, value, buffered=True)
+                elif pref_type == "view":
+                    set_chat_view_mode(chat_id, value, buffered=True)
+                self._schedule_prefs_flush()
                 prefs = get_chat_preferences(chat_id)
                 if prefs:
-                    report = self.aggregator.build_report()
-                    text = MessageFormatter.format_master_report(
-                        report, 
-                        style=prefs.view_mode, 
-                        lang=prefs.language,
-                        status_config=self.config.status_config
+                    self._chat_prefs[chat_id] = prefs
+
+            # Re-render report if aggregator is available
+            if self.aggregator and prefs:
+                report = self.aggregator.build_report()
+                text = self._render_report(report, prefs.language, prefs.view_mode)
+
+                message_key = (chat_id, callback.message.message_id)
+                rendered = hash((text, prefs.language, prefs.view_mode))
+                if self._last_rendered.get(message_key) == rendered:
+                    # Same content: editing would only fail with "message is not modified"
+                    await callback.answer("Already selected")
+                    return
+
+                keyboard = self._get_keyboard(prefs.language, prefs.view_mode)
+
+                # Edit message (old messages may arrive as InaccessibleMessage)
+                if isinstance(callback.message, Message):
+                    await callback.message.edit_text(
+                        text=text,
+                        reply_markup=keyboard,
+                        parse_mode=ParseMode.HTML
                     )
-                    
-                    keyboard = self._get_keyboard(prefs.language, prefs.view_mode)
-                    
-                    # Edit message
-                    # Check if message is accessible (it should be for callbacks)
-                    if hasattr(callback.message, "edit_text"):
-                        await callback.message.edit_text(
-                            text=text,
-                            reply_markup=keyboard,
-                            parse_mode=ParseMode.HTML
-                        )
-            
+                    self._remember_rendered(message_key, rendered)
+
             await callback.answer("Preferences updated")
-            
+
         except Exception as e:
             logger.error(f"Error handling callback: {e}")
             await callback.answer("Error updating preferences")
 
+    def _get_target_prefs(self, target: TelegramTargetConfig) -> ChatPreferences:
+        """Get preferences for a master target, creating defaults on first use (cached)."""
+        prefs = self._chat_prefs.get(target.chat_id)
+        if prefs is None:
+            now = datetime.now()
+            defaults = ChatPreferences(
+                chat_id=target.chat_id,
+                language=target.default_language,
+                view_mode=target.default_view_mode,
+                created_at=now,
+                updated_at=now
+            )
+            prefs = ensure_default_preferences(target.chat_id, defaults)
+            self._chat_prefs[target.chat_id] = prefs
+        return prefs
+
+    def _prefetch_target_prefs(self, targets: List[TelegramTargetConfig]) -> None:
+        """Load stored preferences of all uncached targets with one query."""
+        missing = [target.chat_id for target in targets if target.chat_id not in self._chat_prefs]
+        if missing:
+            self._chat_prefs.update(get_chat_preferences_bulk(missing))
+
+    def _schedule_prefs_flush(self) -> None:
+        """Persist buffered preference changes shortly, coalescing bursts of taps."""
+        if self._prefs_flush_task is None:
+            self._prefs_flush_task = asyncio.create_task(self._flush_prefs_after(CHAT_PREFS_FLUSH_DELAY))
+
+    async def _flush_prefs_after(self, delay: float) -> None:
+        """Wait for the coalescing window to close, then write preferences off the loop."""
+        await asyncio.sleep(delay)
+        self._prefs_flush_task = None
+        try:
+            await asyncio.to_thread(flush_pending_writes)
+        except Exception as e:
+            logger.error(f"Error saving chat preferences: {e}")
+
+    def invalidate_chat_cache(self) -> None:
+        """Drop cached chat preferences (e.g. after a configuration reload)."""
+        self._chat_prefs.clear()
+
+    def _remember_rendered(self, message_key: Tuple[int, int], rendered: int) -> None:
+        """Record the content hash shown in a message, evicting the oldest entries."""
+        self._last_rendered[message_key] = rendered
+        self._last_rendered.move_to_end(message_key)
+        while len(self._last_rendered) > CALLBACK_RENDER_CACHE_SIZE:
+            self._last_rendered.popitem(last=False)
+
     async def start_polling(self):
-        """Start Telegram bot polling."""
+        """
+        Start Telegram bot polling.
+
+        Uses long polling limited to callback queries: the bot only reacts to
+        settings buttons, so idle polls wait up to TELEGRAM_POLLING_TIMEOUT
+        seconds and return immediately when a button is pressed. Signal
+        handling is left to the host application (aiohttp in master mode).
+        """
         if not self.config.telegram.bot_token:
             return
             
-        bot = Bot(token=self.config.telegram.bot_token)
+        bot = self._get_bot()
         logger.info("Starting Telegram bot polling...")
         try:
-            await self.dp.start_polling(bot)
+            await self.dp.start_polling(
+                bot,
+                polling_timeout=TELEGRAM_POLLING_TIMEOUT,
+                allowed_updates=["callback_query"],
+                handle_signals=False,
+                close_bot_session=False,
+            )
         except Exception as e:
             logger.error(f"Polling error: {e}")
-        finally:
-            await bot.session.close()
+
+    def _get_bot(self) -> Bot:
+        """
+        Get the shared Bot instance, creating it on first use.
+
+        Construction is synchronous, so concurrent coroutines on one loop
+        cannot race here and no lock is needed.
+        """
+        if self._bot is None:
+            self._bot = Bot(token=self.config.telegram.bot_token, session=self._session)
+        return self._bot
+
+    def _get_send_semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the semaphore limiting concurrent sends, creating it on first use.
+
+        Created lazily because on Python < 3.10 asyncio primitives bind to the
+        event loop that is current at construction time.
+        """
+        if self._send_semaphore is None:
+            self._send_semaphore = asyncio.Semaphore(TELEGRAM_MAX_CONCURRENT_SENDS)
+        return self._send_semaphore
+
+    async def close(self) -> None:
+        """Save buffered chat preferences and close the shared Telegram HTTP session."""
+        if self._prefs_flush_task is not None:
+            self._prefs_flush_task.cancel()
+            self._prefs_flush_task = None
+        flush_pending_writes()
+        await self._session.close()
+
+    def close_sync(self) -> None:
+        """Close the shared HTTP session from synchronous code (see send_notification_sync)."""
+        if _loop is None:
+            return
+        try:
+            _run_in_loop(self.close(), TELEGRAM_API_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Error closing Telegram session: {e}")
+
+    def refresh_system_info(self) -> None:
+        """Re-read system information and drop server details derived from it."""
+        get_system_info.cache_clear()
+        self._system_info = get_system_info()
+        self._server_name = None
+        self._server_identifier = None
+        self._server_info = None
 
     def _get_server_name(self) -> str:
         """Get server name (auto-detect if needed, cached)."""
         if self._server_name is None:
             if self.config.server.name == "auto":
-                system_info = get_system_info()
-                self._server_name = system_info["hostname"]
+                self._server_name = self._system_info["hostname"]
             else:
                 self._server_name = self.config.server.name
         return self._server_name
@@ -169,28 +402,43 @@ class TelegramNotifier:
                 self._server_location = self.config.server.location
         return self._server_location
 
+    def _get_server_info(self) -> Dict[str, str]:
+        """Get server details for single-result messages (built once, cached)."""
+        if self._server_info is None:
+            self._server_info = {
+                "name": self._get_server_name(),
+                "location": self._get_server_location(),
+                "id": self._get_server_identifier(),
+                "description": self.config.server.description
+            }
+        return self._server_info
+
+    async def _resolve_server_location(self) -> None:
+        """
+        Resolve an auto-detected server location without blocking the event loop.
+
+        The IP lookup uses blocking HTTP, so on a cache miss it runs in a worker
+        thread while polling and other sends keep running.
+        """
+        if self._server_location is None and self.config.server.location == "auto":
+            location = await asyncio.to_thread(get_location_by_ip)
+            self._server_location = location or "Unknown"
+
     def _get_server_identifier(self) -> str:
         """Get server identifier (auto-detect if needed, cached)."""
         if self._server_identifier is None:
             if self.config.server.identifier == "auto":
-                system_info = get_system_info()
-                self._server_identifier = system_info["hostname"]
+                self._server_identifier = self._system_info["hostname"]
             else:
                 self._server_identifier = self.config.server.identifier
         return self._server_identifier
 
     def _calculate_status_key(self, download_mbps: float) -> str:
         """Calculate status key based on download speed."""
-        thresholds = self.config.thresholds
-        if download_mbps < thresholds.very_low:
-            return "very_low"
-        elif download_mbps < thresholds.low:
-            return "low"
-        elif download_mbps < thresholds.medium:
-            return "normal"
-        elif download_mbps < thresholds.good:
-            return "good"
-        return "excellent"
+        if self._thresholds is None:
+            t = self.config.thresholds
+            self._thresholds = [t.very_low, t.low, t.medium, t.good]
+        return _STATUS_KEYS[bisect.bisect_right(self._thresholds, download_mbps)]
 
     def _format_message(self, result: SpeedtestResult, language: str = "ru", style: Optional[str] = None) -> str:
         """
@@ -199,33 +447,27 @@ class TelegramNotifier:
         Args:
             result: Speedtest result to format
             language: Language code ("en" or "ru")
-            style: Message style ("compact" or "detailed"). If None, uses config or default.
+            style: Message style ("compact" or "detailed"). If None, uses config.
 
         Returns:
             Formatted message text
         """
-        server_info = {
-            "name": self._get_server_name(),
-            "location": self._get_server_location(),
-            "id": self._get_server_identifier(),
-            "description": self.config.server.description
-        }
-        
         status_key = "unknown"
         if result.success:
             status_key = self._calculate_status_key(result.download_mbps)
 
-        # Use provided style, or configured style, or default to detailed
+        # Use provided style, or configured style
         if not style:
-            style = self.config.telegram.message_style if hasattr(self.config.telegram, "message_style") else "detailed"
+            style = self.config.telegram.message_style
 
         return MessageFormatter.format_single_result(
             result=result,
             style=style,
             lang=language,
-            server_info=server_info,
+            server_info=self._get_server_info(),
             status_config=self.config.status_config,
-            status_key=status_key
+            status_key=status_key,
+            system_info=self._system_info,
         )
 
     def _should_send_notification(self, result: SpeedtestResult) -> bool:
@@ -238,12 +480,12 @@ class TelegramNotifier:
         Returns:
             True if notification should be sent
         """
-        # Always send errors
-        if not result.success:
+        # If send_always is enabled (the common steady-state path)
+        if self.config.telegram.send_always:
             return True
 
-        # If send_always is enabled
-        if self.config.telegram.send_always:
+        # Always send errors
+        if not result.success:
             return True
 
         # Send only if speed is below threshold
@@ -252,6 +494,9 @@ class TelegramNotifier:
     async def _send_to_recipient(self, bot: Bot, chat_id: str, message: str, reply_markup: Optional[InlineKeyboardMarkup] = None) -> bool:
         """
         Send message to a single recipient with retry logic.
+
+        Retries use exponential backoff with jitter. Rate limits honour Telegram's
+        retry_after hint, and bad requests (invalid chat, broken HTML) are not retried.
         
         Args:
             bot: Bot instance
@@ -263,22 +508,38 @@ class TelegramNotifier:
             True if sent successfully
         """
         for attempt in range(TELEGRAM_RETRY_COUNT):
+            self.delivery_stats["attempts"] += 1
             try:
-                await asyncio.wait_for(
-                    bot.send_message(
-                        chat_id=chat_id,
-                        text=message,
-                        parse_mode=ParseMode.HTML,
-                        reply_markup=reply_markup,
-                    ),
-                    timeout=TELEGRAM_API_TIMEOUT,
-                )
+                # Hold the slot only for the request itself, not during backoff sleeps
+                async with self._get_send_semaphore():
+                    await asyncio.wait_for(
+                        bot.send_message(
+                            chat_id=chat_id,
+                            text=message,
+                            parse_mode=ParseMode.HTML,
+                            reply_markup=reply_markup,
+                        ),
+                        timeout=TELEGRAM_API_TIMEOUT,
+                    )
                 logger.info(f"Message sent successfully to {chat_id}")
+                self.delivery_stats["sent"] += 1
                 return True
                 
             except asyncio.TimeoutError:
                 logger.warning(f"Timeout sending to {chat_id} (attempt {attempt + 1}/{TELEGRAM_RETRY_COUNT})")
-                
+
+            except TelegramRetryAfter as e:
+                self.delivery_stats["rate_limited"] += 1
+                logger.warning(f"Rate limited for {chat_id}, retrying after {e.retry_after}s (attempt {attempt + 1}/{TELEGRAM_RETRY_COUNT})")
+                if attempt < TELEGRAM_RETRY_COUNT - 1:
+                    await asyncio.sleep(e.retry_after)
+                continue
+
+            except TelegramBadRequest as e:
+                logger.error(f"Telegram rejected message for {chat_id}, not retrying: {e}")
+                self.delivery_stats["failed"] += 1
+                return False
+
             except TelegramAPIError as e:
                 logger.error(f"Telegram API error for {chat_id} (attempt {attempt + 1}/{TELEGRAM_RETRY_COUNT}): {e}")
                 
@@ -286,8 +547,10 @@ class TelegramNotifier:
                 logger.error(f"Error sending to {chat_id} (attempt {attempt + 1}/{TELEGRAM_RETRY_COUNT}): {e}")
             
             if attempt < TELEGRAM_RETRY_COUNT - 1:
-                await asyncio.sleep(TELEGRAM_RETRY_DELAY)
+                delay = min(TELEGRAM_RETRY_DELAY * (2 ** attempt), TELEGRAM_RETRY_MAX_DELAY)
+                await asyncio.sleep(delay + random.uniform(0, TELEGRAM_RETRY_JITTER))
         
+        self.delivery_stats["failed"] += 1
         return False
 
     async def send_notification(self, result: SpeedtestResult) -> bool:
@@ -308,39 +571,60 @@ class TelegramNotifier:
             logger.info("Skipping notification (speed is good and send_always=False)")
             return False
 
+        if not self.config.telegram.bot_token or not self.config.telegram.chat_ids:
+            logger.warning("No recipients or bot token configured")
+            return False
+
+        return await self._deliver(result)
+
+    async def _deliver(self, result: SpeedtestResult) -> bool:
+        """
+        Send the formatted result to all configured recipients.
+
+        Args:
+            result: Speedtest result to send
+
+        Returns:
+            True if the message reached at least one recipient
+        """
+        # In Single Mode, we use configuration directly since there are no interactive buttons,
+        # so every recipient gets the same text: format and validate it once
+        lang = self.config.telegram.language
+        view_mode = self.config.telegram.message_style
+
+        await self._resolve_server_location()
+        message = self._format_message(result, lang, style=view_mode)
+
+        # Validate message length
+        length = telegram_length(message)
+        if length > MAX_MESSAGE_LENGTH:
+            logger.warning(f"Message too long ({length} chars), truncating...")
+            message = truncate_message(message)
+
         # Send to all configured recipients
-        async with Bot(token=self.config.telegram.bot_token) as bot:
-            success_count = 0
-            total_recipients = len(self.config.telegram.chat_ids)
-            
-            # Send to all chat_ids (supports both groups and personal messages)
-            for chat_id in self.config.telegram.chat_ids:
-                # In Single Mode, we use configuration directly since there are no interactive buttons
-                lang = self.config.telegram.language if hasattr(self.config.telegram, "language") else "ru"
-                view_mode = self.config.telegram.message_style if hasattr(self.config.telegram, "message_style") else "detailed"
+        bot = self._get_bot()
+        total_recipients = len(self.config.telegram.chat_ids)
 
-                message = self._format_message(result, lang, style=view_mode)
-                
-                # Validate message length
-                if len(message) > MAX_MESSAGE_LENGTH:
-                    logger.warning(f"Message too long ({len(message)} chars), truncating...")
-                    message = message[:MAX_MESSAGE_LENGTH - 3] + "..."
+        # Send to all chat_ids concurrently (supports both groups and personal messages)
+        sent = await asyncio.gather(
+            *(self._send_to_recipient(bot, chat_id, message) for chat_id in self.config.telegram.chat_ids)
+        )
+        success_count = sum(sent)
 
-                if await self._send_to_recipient(bot, chat_id, message):
-                    success_count += 1
-            
-            if success_count > 0:
-                logger.info(f"Notification sent to {success_count}/{total_recipients} recipients")
-                return True
-            else:
-                logger.error(f"Failed to send notification to any recipient ({total_recipients} total)")
-                return False
+        if success_count > 0:
+            logger.info(f"Notification sent to {success_count}/{total_recipients} recipients")
+            return True
+        else:
+            logger.error(f"Failed to send notification to any recipient ({total_recipients} total)")
+            return False
 
     def send_notification_sync(self, result: SpeedtestResult) -> bool:
         """
         Send speedtest result to Telegram (sync wrapper).
         
-        Thread-safe synchronous wrapper that properly manages event loop.
+        Thread-safe synchronous wrapper. Coroutines are submitted to a single
+        persistent background event loop instead of creating a new loop per call,
+        so it is also safe to call from a thread that already runs an event loop.
 
         Args:
             result: Speedtest result to send
@@ -353,17 +637,84 @@ class TelegramNotifier:
             >>> notifier.send_notification_sync(result)
         """
         try:
-            # Create new event loop for thread safety
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(self.send_notification(result))
-            finally:
-                loop.close()
+            return _run_in_loop(
+                self.send_notification(result),
+                timeout=TELEGRAM_API_TIMEOUT * TELEGRAM_RETRY_COUNT + 10,
+            )
         except Exception as e:
             logger.error(f"Error in sync wrapper: {e}")
             return False
 
+    def _render_report(self, report, lang: str, view_mode: str) -> str:
+        """
+        Render the aggregated report for one (language, view mode), within Telegram's limit.
+
+        The text depends only on the flattened node rows, so reports with unchanged
+        node states (e.g. repeated settings taps) reuse the cached rendering.
+        """
+        rows = MessageFormatter.extract_render_rows(report)
+        key = (tuple(rows), lang, view_mode)
+        message = self._rendered_reports.get(key)
+        if message is not None:
+            self._rendered_reports.move_to_end(key)
+            return message
+
+        message = MessageFormatter.format_master_report(
+            report,
+            style=view_mode,
+            lang=lang,
+            status_config=self.config.status_config,
+            rows=rows
+        )
+        length = telegram_length(message)
+        if length > MAX_MESSAGE_LENGTH:
+            logger.warning(f"Report too long ({length} chars), truncating...")
+            message = truncate_message(message)
+
+        self._rendered_reports[key] = message
+        while len(self._rendered_reports) > REPORT_RENDER_CACHE_SIZE:
+            self._rendered_reports.popitem(last=False)
+        return message
+
+    async def _send_report_to_target(
+        self,
+        bot: Bot,
+        chat_id: int,
+        message: str,
+        keyboard: InlineKeyboardMarkup,
+        rendered: int,
+    ) -> bool:
+        """
+        Send a rendered aggregated report to one master target.
+
+        Args:
+            bot: Bot instance
+            chat_id: Target chat ID
+            message: Rendered report text
+            keyboard: Settings keyboard matching the target's preferences
+            rendered: Content hash recorded for callback debouncing
+
+        Returns:
+            True if sent successfully
+        """
+        self.delivery_stats["attempts"] += 1
+        try:
+            async with self._get_send_semaphore():
+                sent = await bot.send_message(
+                    chat_id=chat_id,
+                    text=message,
+                    parse_mode=ParseMode.HTML,
+                    reply_markup=keyboard
+                )
+            self._remember_rendered((chat_id, sent.message_id), rendered)
+            self.delivery_stats["sent"] += 1
+            logger.info(f"Message sent successfully to {chat_id}")
+            return True
+        except Exception as e:
+            self.delivery_stats["failed"] += 1
+            logger.error(f"Error sending to {chat_id}: {e}")
+            return False
+
     async def send_aggregated_report(self, report) -> bool:
         """
         Send aggregated report to all master targets.
@@ -378,48 +729,38 @@ class TelegramNotifier:
             logger.warning("No telegram targets configured for master mode")
             return False
 
-        async with Bot(token=self.config.telegram.bot_token) as bot:
-            success_count = 0
-            targets = self.config.master.telegram_targets
-            
-            for target in targets:
-                # Ensure preferences exist
-                defaults = ChatPreferences(
-                    chat_id=target.chat_id,
-                    language=target.default_language,
-                    view_mode=target.default_view_mode,
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
-                )
-                prefs = ensure_default_preferences(target.chat_id, defaults)
-                
-                # Render message
-                message = MessageFormatter.format_master_report(
-                    report, 
-                    style=prefs.view_mode, 
-                    lang=prefs.language,
-                    status_config=self.config.status_config
-                )
-                
-                keyboard = self._get_keyboard(prefs.language, prefs.view_mode)
-                
-                # Send message with keyboard
-                try:
-                    await bot.send_message(
-                        chat_id=target.chat_id,
-                        text=message,
-                        parse_mode=ParseMode.HTML,
-                        reply_markup=keyboard
-                    )
-                    success_count += 1
-                    logger.info(f"Message sent successfully to {target.chat_id}")
-                except Exception as e:
-                    logger.error(f"Error sending to {target.chat_id}: {e}")
-            
-            if success_count > 0:
-                logger.info(f"Aggregated report sent to {success_count}/{len(targets)} recipients")
-                return True
-            else:
-                logger.error("Failed to send aggregated report to any recipient")
-                return False
+        if not self.config.telegram.bot_token:
+            logger.warning("No bot token configured for master mode")
+            return False
+
+        bot = self._get_bot()
+        targets = self.config.master.telegram_targets
+        self._prefetch_target_prefs(targets)
+
+        # Targets sharing (language, view mode) get identical text and keyboard,
+        # so group them and render once per group
+        buckets: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for target in targets:
+            prefs = self._get_target_prefs(target)
+            buckets[(prefs.language, prefs.view_mode)].append(target.chat_id)
+
+        sends: List[Awaitable[bool]] = []
+        for (lang, view_mode), chat_ids in buckets.items():
+            message = self._render_report(report, lang, view_mode)
+            keyboard = self._get_keyboard(lang, view_mode)
+            rendered = hash((message, lang, view_mode))
+            sends.extend(
+                self._send_report_to_target(bot, chat_id, message, keyboard, rendered)
+                for chat_id in chat_ids
+            )
+
+        results = await asyncio.gather(*sends)
+        success_count = sum(results)
+
+        if success_count > 0:
+            logger.info(f"Aggregated report sent to {success_count}/{len(targets)} recipients")
+            return True
+        else:
+            logger.error("Failed to send aggregated report to any recipient")
+            return False
 
@@ -4,12 +4,97 @@ Utility functions for the speedtest monitor.
 Common helper functions used across the application.
 """
 
+import json
+import os
 import platform
 import socket
-from functools import lru_cache
-from typing import Dict, Optional
+import time
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar, cast
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .constants import (
+    API_RETRY_COUNT,
+    IPAPI_URL,
+    IPIFY_URL,
+    LOOKUP_CACHE_PATH,
+    LOOKUP_CACHE_TTL,
+    MAX_MESSAGE_LENGTH,
+)
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+# Cached network lookups: {key: [value, expires_at]}, shared between runs via disk
+_lookup_cache: Optional[Dict[str, list]] = None
+
+
+def _load_lookup_cache() -> Dict[str, list]:
+    """Load the lookup cache from disk on first use."""
+    global _lookup_cache
+    if _lookup_cache is None:
+        try:
+            with open(Path(LOOKUP_CACHE_PATH).expanduser(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError, RuntimeError):
+            data = {}
+        # Malformed entries (e.g. a hand-edited file) are dropped and looked up again
+        _lookup_cache = {
+            k: v for k, v in data.items()
+            if isinstance(v, list) and len(v) == 2 and isinstance(v[1], (int, float))
+        } if isinstance(data, dict) else {}
+    return _lookup_cache
+
+
+def _save_lookup_cache(cache: Dict[str, list]) -> None:
+    """Atomically persist unexpired cache entries (best effort)."""
+    now = time.time()
+    try:
+        path = Path(LOOKUP_CACHE_PATH).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in cache.items() if v[1] > now}, f)
+        os.replace(tmp_path, path)
+    except (OSError, RuntimeError):
+        pass
+
+
+def ttl_cache(seconds: int) -> Callable[[_F], _F]:
+    """
+    Cache successful (non-None) results of a lookup function for a period of time.
+
+    Results are kept in memory and persisted to LOOKUP_CACHE_PATH, so short-lived
+    runs (cron/systemd timer) do not repeat network lookups either.
+
+    Args:
+        seconds: How long a cached result stays valid
+
+    Returns:
+        Decorator for functions with str()-able arguments
+    """
+    def decorator(func: _F) -> _F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = ":".join([func.__name__, *map(str, args), *(f"{k}={v}" for k, v in sorted(kwargs.items()))])
+            cache = _load_lookup_cache()
+            entry = cache.get(key)
+            now = time.time()
+            if entry and entry[1] > now:
+                return entry[0]
+
+            value = func(*args, **kwargs)
+            if value is not None:
+                cache[key] = [value, now + seconds]
+                _save_lookup_cache(cache)
+            return value
+
+        return cast(_F, wrapper)
+
+    return decorator
 
 
 @lru_cache(maxsize=1)
@@ -36,10 +121,27 @@ def get_system_info() -> Dict[str, str]:
     }
 
 
+@lru_cache(maxsize=1)
+def _get_http_session() -> requests.Session:
+    """
+    Get the shared HTTP session for external lookups, creating it on first use.
+
+    Keeps connections alive between lookups and retries transient server errors.
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = "speedtest-monitor/1.0"
+    retry = Retry(total=API_RETRY_COUNT, backoff_factor=0.2, status_forcelist=(500, 502, 503, 504))
+    session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry))
+    return session
+
+
+@ttl_cache(LOOKUP_CACHE_TTL)
 def get_public_ip() -> Optional[str]:
     """
     Get public IP address of the server.
 
+    Successful lookups are cached for LOOKUP_CACHE_TTL seconds.
+
     Returns:
         Public IP address or None if failed
 
@@ -49,17 +151,20 @@ def get_public_ip() -> Optional[str]:
         '192.168.1.1'
     """
     try:
-        response = requests.get("https://api.ipify.org", timeout=3)
+        response = _get_http_session().get(IPIFY_URL, timeout=3)
         response.raise_for_status()
         return response.text.strip()
     except Exception:
         return None
 
 
+@ttl_cache(LOOKUP_CACHE_TTL)
 def get_location_by_ip(ip: Optional[str] = None) -> Optional[str]:
     """
     Get approximate location by IP address.
 
+    Successful lookups are cached for LOOKUP_CACHE_TTL seconds.
+
     Args:
         ip: IP address to lookup. If None, uses current public IP
 
@@ -78,11 +183,7 @@ def get_location_by_ip(ip: Optional[str] = None) -> Optional[str]:
         return None
 
     try:
-        response = requests.get(
-            f"https://ipapi.co/{ip}/json/", 
-            timeout=3,
-            headers={"User-Agent": "speedtest-monitor/1.0"}
-        )
+        response = _get_http_session().get(IPAPI_URL.format(ip=ip), timeout=3)
         response.raise_for_status()
         data = response.json()
         
@@ -134,3 +235,54 @@ def format_ping(ping_ms: float) -> str:
         '15.50 ms'
     """
     return f"{ping_ms:.2f} ms"
+
+
+def telegram_length(text: str) -> int:
+    """
+    Get the length of a text as Telegram counts it, in UTF-16 code units.
+
+    Characters outside the Basic Multilingual Plane (most emoji) count as two.
+
+    Example:
+        >>> telegram_length("🚀 ok")
+        5
+    """
+    return len(text.encode("utf-16-le")) // 2
+
+
+def truncate_message(message: str, limit: int = MAX_MESSAGE_LENGTH) -> str:
+    """
+    Truncate a message to Telegram's length limit at a line boundary.
+
+    The limit is measured in UTF-16 code units (see telegram_length), so
+    emoji-heavy messages are not cut too late. Cutting at a newline keeps
+    per-line HTML tags (<b>...</b>) balanced, which a blind slice could
+    break and make Telegram reject the message.
+
+    Args:
+        message: Message text
+        limit: Maximum message length in UTF-16 code units
+
+    Returns:
+        The message unchanged if it fits, otherwise a truncated copy ending in "…"
+
+    Example:
+        >>> truncate_message("line 1\nline 2", limit=10)
+        'line 1\n…'
+    """
+    if telegram_length(message) <= limit:
+        return message
+
+    # Longest prefix that leaves room for the "…" marker
+    low, high = 0, min(len(message), limit - 1)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if telegram_length(message[:mid]) <= limit - 1:
+            low = mid
+        else:
+            high = mid - 1
+
+    cut = message.rfind("\n", 0, low)
+    if cut <= 0:
+        return message[:low] + "…"
+    return message[:cut] + "\n…"
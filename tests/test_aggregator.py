@@ -3,10 +3,17 @@ Tests for the Aggregator module.
 """
 
 import pytest
+import time
+from dataclasses import FrozenInstanceError
 from datetime import datetime, timedelta
 from speedtest_monitor.aggregator import Aggregator
 from speedtest_monitor.config import Config, MasterConfig, NodeMetaConfig
-from speedtest_monitor.models import SpeedtestResult
+from speedtest_monitor.models import (
+    AggregatedReport,
+    NodeAggregatedStatus,
+    NodeDisplayMeta,
+    SpeedtestResult,
+)
 
 @pytest.fixture
 def mock_config():
@@ -88,8 +95,8 @@ def test_build_report_timeout(aggregator):
         node_id="node1", timestamp=old_time, download_mbps=10, upload_mbps=10, ping_ms=10, status="good", test_server="S", isp="I", os_info="O"
     ))
     
-    # Manually set update time to old
-    aggregator.last_updated_at["node1"] = old_time
+    # Manually set update time to old (monotonic clock seconds)
+    aggregator.last_updated_at["node1"] = time.monotonic() - 61 * 60
     
     report = aggregator.build_report()
     node_status = report.nodes[0]
@@ -115,10 +122,33 @@ def test_build_report_statuses(aggregator):
     
     report = aggregator.build_report()
     
-    n1 = next(n for n in report.nodes if n.meta.node_id == "node1")
-    n2 = next(n for n in report.nodes if n.meta.node_id == "node2")
+    n1 = report.nodes_by_id["node1"]
+    n2 = report.nodes_by_id["node2"]
     
     assert n1.derived_status == "ok"
     assert n2.derived_status == "degraded"
     assert report.summary["ok"] == 1
     assert report.summary["degraded"] == 1
+
+def test_report_indexes_nodes_by_id():
+    """Test that reports built directly also index their nodes by id."""
+    node = NodeAggregatedStatus(
+        meta=NodeDisplayMeta(node_id="node1"),
+        last_result=None,
+        is_online=False,
+        derived_status="offline",
+    )
+    report = AggregatedReport(datetime.now(), [node], {})
+
+    assert report.nodes_by_id == {"node1": node}
+
+
+def test_build_report_reuses_display_meta(aggregator):
+    """Test that node display metadata is built once and shared by reports."""
+    first = aggregator.build_report()
+    second = aggregator.build_report()
+
+    assert first.nodes[0].meta.display_name == "Node 1"
+    assert all(a.meta is b.meta for a, b in zip(first.nodes, second.nodes))
+    with pytest.raises(FrozenInstanceError):
+        first.nodes[0].meta.display_name = "Renamed"
@@ -7,12 +7,15 @@ import sqlite3
 from pathlib import Path
 from datetime import datetime
 from unittest.mock import patch
+from speedtest_monitor import chat_prefs
 from speedtest_monitor.chat_prefs import (
     ChatPreferences,
     get_chat_preferences,
     set_chat_language,
     set_chat_view_mode,
     ensure_default_preferences,
+    get_chat_preferences_bulk,
+    flush_pending_writes,
     _init_db
 )
 
@@ -70,3 +73,55 @@ def test_get_nonexistent_preferences(temp_db):
     """Test getting preferences for unknown chat."""
     prefs = get_chat_preferences(999)
     assert prefs is None
+
+def test_get_chat_preferences_bulk(temp_db):
+    """Test fetching preferences for several chats at once."""
+    for chat_id, language in ((1, "en"), (2, "ru")):
+        ensure_default_preferences(chat_id, ChatPreferences(
+            chat_id=chat_id,
+            language=language,
+            view_mode="compact",
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        ))
+
+    prefs = get_chat_preferences_bulk([1, 2, 3])
+    assert set(prefs) == {1, 2}
+    assert prefs[2].language == "ru"
+    assert get_chat_preferences_bulk([]) == {}
+
+def test_buffered_writes_flush_and_read_back(temp_db):
+    """Test that buffered changes are visible at once and persisted by a flush."""
+    chat_id = 789
+    ensure_default_preferences(chat_id, ChatPreferences(
+        chat_id=chat_id,
+        language="en",
+        view_mode="compact",
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    ))
+
+    set_chat_language(chat_id, "ru", buffered=True)
+    assert get_chat_preferences(chat_id).language == "ru"
+
+    # A change arriving while the flush writes must not be lost or block on the lock
+    write_pref = chat_prefs._write_pref
+
+    def write_and_change(*args):
+        set_chat_view_mode(chat_id, "detailed", buffered=True)
+        write_pref(*args)
+
+    with patch("speedtest_monitor.chat_prefs._write_pref", side_effect=write_and_change):
+        flush_pending_writes()
+
+    assert chat_prefs._pending_writes[chat_id]["view_mode"] == "detailed"
+    prefs = get_chat_preferences(chat_id)
+    assert (prefs.language, prefs.view_mode) == ("ru", "detailed")
+
+    flush_pending_writes()
+    assert chat_prefs._pending_writes == {}
+    with sqlite3.connect(temp_db) as conn:
+        row = conn.execute(
+            "SELECT language, view_mode FROM chat_prefs WHERE chat_id = ?", (chat_id,)
+        ).fetchone()
+    assert row == ("ru", "detailed")
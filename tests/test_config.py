@@ -25,3 +25,20 @@ def test_config_validation():
     """Test configuration validation."""
     # Test invalid values
     pass
+
+
+def test_load_config_reads_telegram_language_and_style(tmp_path, monkeypatch):
+    """Test that telegram.language and telegram.message_style come from YAML."""
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "token")
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        "telegram:\n"
+        "  chat_ids: ['1']\n"
+        "  language: en\n"
+        "  message_style: compact\n",
+        encoding="utf-8",
+    )
+
+    config = load_config(config_path)
+    assert config.telegram.language == "en"
+    assert config.telegram.message_style == "compact"
@@ -1,5 +1,7 @@
+import unicodedata
 import unittest
 from datetime import datetime
+from speedtest_monitor import message_formatter
 from speedtest_monitor.message_formatter import MessageFormatter
 from speedtest_monitor.speedtest_runner import SpeedtestResult as RunnerResult
 from speedtest_monitor.models import SpeedtestResult as ModelResult, AggregatedReport, NodeDisplayMeta, NodeAggregatedStatus
@@ -78,5 +80,23 @@ class TestMessageFormatter(unittest.TestCase):
         self.assertIn("500", msg)
         self.assertIn("Хорошо", msg)
 
+    def test_strings_are_not_double_encoded(self):
+        texts = list(message_formatter.STATUS_EMOJIS.values())
+        for strings in message_formatter.STRINGS.values():
+            texts.extend(strings.values())
+        texts.extend([message_formatter._DETAILED_NODE_TMPL, message_formatter._DETAILED_OFFLINE_TMPL])
+
+        for text in texts:
+            # Mojibake is UTF-8 read as a single-byte codepage: re-encoding it there yields valid UTF-8
+            for codepage in ("latin-1", "cp1252", "cp1254"):
+                try:
+                    original = text.encode(codepage).decode("utf-8")
+                except UnicodeError:
+                    continue
+                self.assertEqual(original, text, f"{text!r} looks like {codepage} mojibake")
+
+        for emoji in message_formatter.STATUS_EMOJIS.values():
+            self.assertTrue(any(unicodedata.category(ch) == "So" for ch in emoji), repr(emoji))
+
 if __name__ == "__main__":
     unittest.main()
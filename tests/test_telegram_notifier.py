@@ -2,10 +2,34 @@
 Tests for Telegram notifier.
 """
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
-from speedtest_monitor.telegram_notifier import TelegramNotifier
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+
+from speedtest_monitor import chat_prefs
+from speedtest_monitor.config import Config, TelegramTargetConfig, ThresholdsConfig
+from speedtest_monitor.message_formatter import MessageFormatter
+from speedtest_monitor.models import AggregatedReport, NodeAggregatedStatus, NodeDisplayMeta
 from speedtest_monitor.speedtest_runner import SpeedtestResult
-from speedtest_monitor.config import Config
+from speedtest_monitor.telegram_notifier import TelegramNotifier
+
+
+@pytest.fixture
+def mock_config():
+    """Create a Config mock whose sections accept any attribute a test sets."""
+    config = MagicMock(spec=Config)
+    config.server = MagicMock()
+    config.speedtest = MagicMock()
+    config.thresholds = MagicMock()
+    config.telegram = MagicMock()
+    config.logging = MagicMock()
+    return config
 
 
 def test_format_message_success():
@@ -47,3 +71,310 @@ async def test_send_notification_async():
     # Test successful send
     # Test retry logic
     pass
+
+
+def test_send_notification_sync_reuses_background_loop(mock_config):
+    """Test that the sync wrapper runs every call on the same persistent loop."""
+    notifier = TelegramNotifier(mock_config)
+    loops = []
+
+    async def fake_send(result):
+        loops.append(asyncio.get_running_loop())
+        return True
+
+    notifier.send_notification = fake_send
+
+    assert notifier.send_notification_sync(MagicMock()) is True
+    assert notifier.send_notification_sync(MagicMock()) is True
+    assert loops[0] is loops[1]
+    assert loops[0].is_running()
+
+
+def test_send_notification_sync_from_many_threads(mock_config):
+    """Test that concurrent sync calls from worker threads share one loop."""
+    notifier = TelegramNotifier(mock_config)
+    loops = set()
+
+    async def fake_send(result):
+        loops.add(asyncio.get_running_loop())
+        await asyncio.sleep(0.01)
+        return True
+
+    notifier.send_notification = fake_send
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        sent = list(pool.map(notifier.send_notification_sync, range(16)))
+
+    assert all(sent)
+    assert len(loops) == 1
+
+
+@pytest.mark.asyncio
+async def test_send_to_recipient_does_not_retry_bad_request(mock_config):
+    """Test that a rejected message is not retried."""
+    notifier = TelegramNotifier(mock_config)
+    bot = MagicMock()
+    bot.send_message = AsyncMock(side_effect=TelegramBadRequest(MagicMock(), "chat not found"))
+
+    assert await notifier._send_to_recipient(bot, "123", "text") is False
+    assert bot.send_message.await_count == 1
+    assert notifier.delivery_stats == {"attempts": 1, "failed": 1}
+
+
+@pytest.mark.asyncio
+async def test_send_to_recipient_honours_retry_after(mock_config):
+    """Test that rate limits wait for Telegram's retry_after before retrying."""
+    notifier = TelegramNotifier(mock_config)
+    bot = MagicMock()
+    bot.send_message = AsyncMock(
+        side_effect=[TelegramRetryAfter(MagicMock(), "flood control", retry_after=7), MagicMock()]
+    )
+
+    with patch("speedtest_monitor.telegram_notifier.asyncio.sleep", new=AsyncMock()) as sleep:
+        assert await notifier._send_to_recipient(bot, "123", "text") is True
+
+    sleep.assert_awaited_once_with(7)
+    assert bot.send_message.await_count == 2
+    assert notifier.delivery_stats == {"attempts": 2, "rate_limited": 1, "sent": 1}
+
+
+def test_keyboards_are_precomputed(mock_config):
+    """Test that keyboards are built once per (language, view mode)."""
+    notifier = TelegramNotifier(mock_config)
+    keyboard = notifier._get_keyboard("en", "detailed")
+
+    assert keyboard is notifier._get_keyboard("en", "detailed")
+    assert keyboard.inline_keyboard[0][1].text == "✅ 🌐 en"
+    assert keyboard.inline_keyboard[1][1].text == "✅ 📋 detailed"
+
+
+@pytest.mark.asyncio
+async def test_callback_skips_unchanged_edit(tmp_path, mock_config):
+    """Test that re-selecting the active option does not edit the message again."""
+    mock_config.status_config = None
+    aggregator = MagicMock()
+    aggregator.build_report.return_value = AggregatedReport(
+        generated_at=datetime.now(), nodes=[], summary={}
+    )
+    notifier = TelegramNotifier(mock_config, aggregator=aggregator)
+
+    callback = MagicMock()
+    callback.data = "pref:lang:en"
+    callback.message = MagicMock(spec=Message)
+    callback.message.chat = MagicMock(id=42)
+    callback.message.message_id = 7
+    callback.message.edit_text = AsyncMock()
+    callback.answer = AsyncMock()
+
+    with patch("speedtest_monitor.chat_prefs.DB_PATH", tmp_path / "prefs.db"):
+        await notifier._handle_callback(callback)
+        await notifier._handle_callback(callback)
+        await notifier.close()
+
+    callback.message.edit_text.assert_awaited_once()
+    callback.answer.assert_awaited_with("Already selected")
+
+
+@pytest.mark.asyncio
+async def test_callback_ignores_invalid_data(mock_config):
+    """Test that malformed or mismatched callback data is ignored."""
+    notifier = TelegramNotifier(mock_config)
+    invalid = ("pref:lang", "pref:lang:compact", "pref:view:de", "pref:lang:en:extra", "pref:lang:ru\n")
+    for data in invalid:
+        callback = MagicMock()
+        callback.data = data
+        callback.answer = AsyncMock()
+        with patch("speedtest_monitor.telegram_notifier.set_chat_language") as set_lang:
+            await notifier._handle_callback(callback)
+        set_lang.assert_not_called()
+        callback.answer.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_target_prefs_are_cached(tmp_path, mock_config):
+    """Test that target preferences hit storage once and follow callback changes."""
+    notifier = TelegramNotifier(mock_config)
+    target = TelegramTargetConfig(chat_id=42, default_language="ru", default_view_mode="compact")
+
+    with patch("speedtest_monitor.chat_prefs.DB_PATH", tmp_path / "prefs.db"):
+        with patch(
+            "speedtest_monitor.telegram_notifier.ensure_default_preferences",
+            wraps=chat_prefs.ensure_default_preferences,
+        ) as ensure:
+            assert notifier._get_target_prefs(target).language == "ru"
+            assert notifier._get_target_prefs(target).language == "ru"
+            assert ensure.call_count == 1
+
+        callback = MagicMock()
+        callback.data = "pref:lang:en"
+        callback.message.chat.id = 42
+        callback.answer = AsyncMock()
+        await notifier._handle_callback(callback)
+
+        assert notifier._get_target_prefs(target).language == "en"
+        await notifier.close()
+
+
+@pytest.mark.asyncio
+async def test_send_notification_sync_from_running_loop(mock_config):
+    """Test that the sync wrapper works when called from code that runs a loop."""
+    notifier = TelegramNotifier(mock_config)
+    notifier.send_notification = AsyncMock(return_value=True)
+
+    loop = asyncio.get_running_loop()
+    sent = await loop.run_in_executor(None, notifier.send_notification_sync, MagicMock())
+    assert sent is True
+
+    # Directly inside a coroutine: must not try to reuse the caller's loop
+    assert notifier.send_notification_sync(MagicMock()) is True
+    assert notifier.send_notification.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_send_notification_without_recipients(mock_config):
+    """Test that nothing is formatted or sent when no chat_ids are configured."""
+    mock_config.telegram.send_always = True
+    mock_config.telegram.chat_ids = []
+    notifier = TelegramNotifier(mock_config)
+    notifier._deliver = AsyncMock()
+
+    assert await notifier.send_notification(MagicMock(success=True)) is False
+    notifier._deliver.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_deliver_sends_to_recipients_concurrently(mock_config):
+    """Test that a slow recipient does not delay delivery to the others."""
+    mock_config.telegram.chat_ids = [1, 2, 3]
+    notifier = TelegramNotifier(mock_config)
+    notifier._format_message = MagicMock(return_value="text")
+
+    in_flight = 0
+    peak = 0
+
+    async def send_message(chat_id, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    notifier._get_bot = MagicMock(return_value=MagicMock(send_message=send_message))
+
+    assert await notifier._deliver(MagicMock()) is True
+    assert peak == 3
+    assert notifier.delivery_stats["sent"] == 3
+
+
+@pytest.mark.asyncio
+async def test_aggregated_report_renders_once_per_preferences(tmp_path, mock_config):
+    """Test that targets sharing language and view mode reuse one rendering."""
+    mock_config.master.telegram_targets = [
+        TelegramTargetConfig(chat_id=1, default_language="ru", default_view_mode="compact"),
+        TelegramTargetConfig(chat_id=2, default_language="ru", default_view_mode="compact"),
+        TelegramTargetConfig(chat_id=3, default_language="en", default_view_mode="compact"),
+    ]
+    notifier = TelegramNotifier(mock_config)
+    bot = MagicMock(send_message=AsyncMock(return_value=MagicMock(message_id=7)))
+    notifier._get_bot = MagicMock(return_value=bot)
+
+    with patch("speedtest_monitor.chat_prefs.DB_PATH", tmp_path / "prefs.db"), patch(
+        "speedtest_monitor.telegram_notifier.MessageFormatter.format_master_report", return_value="report"
+    ) as render:
+        assert await notifier.send_aggregated_report(MagicMock()) is True
+
+    assert render.call_count == 2
+    assert bot.send_message.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_location_lookup_runs_off_the_event_loop(mock_config):
+    """Test that auto location detection does not block the running loop."""
+    mock_config.server.location = "auto"
+    notifier = TelegramNotifier(mock_config)
+    threads = []
+
+    def lookup():
+        threads.append(threading.current_thread())
+        return "Moscow, Russia"
+
+    with patch("speedtest_monitor.telegram_notifier.get_location_by_ip", side_effect=lookup):
+        await notifier._resolve_server_location()
+        await notifier._resolve_server_location()
+
+    assert threads == [threads[0]]
+    assert threads[0] is not threading.current_thread()
+    assert notifier._get_server_location() == "Moscow, Russia"
+
+
+def test_server_info_is_cached_until_refresh(mock_config):
+    """Test that server details are built once and rebuilt after a refresh."""
+    mock_config.server.name = "auto"
+    mock_config.server.location = "Lab"
+    mock_config.server.identifier = "auto"
+    notifier = TelegramNotifier(mock_config)
+
+    info = notifier._get_server_info()
+    assert info["location"] == "Lab"
+    assert notifier._get_server_info() is info
+
+    notifier.refresh_system_info()
+    assert notifier._get_server_info() is not info
+
+
+def test_calculate_status_key_boundaries(mock_config):
+    """Test that each threshold value starts the next status band."""
+    mock_config.thresholds = ThresholdsConfig(very_low=50, low=200, medium=500, good=1000)
+    notifier = TelegramNotifier(mock_config)
+
+    assert notifier._calculate_status_key(49.9) == "very_low"
+    assert notifier._calculate_status_key(50) == "low"
+    assert notifier._calculate_status_key(200) == "normal"
+    assert notifier._calculate_status_key(999) == "good"
+    assert notifier._calculate_status_key(1000) == "excellent"
+
+
+@pytest.mark.asyncio
+async def test_callback_preference_writes_are_buffered(tmp_path, mock_config):
+    """Test that preference taps are saved together after the flush delay."""
+    notifier = TelegramNotifier(mock_config)
+    callback = MagicMock()
+    callback.message.chat.id = 42
+    callback.answer = AsyncMock()
+
+    with patch("speedtest_monitor.chat_prefs.DB_PATH", tmp_path / "prefs.db"), patch(
+        "speedtest_monitor.telegram_notifier.CHAT_PREFS_FLUSH_DELAY", 0.01
+    ), patch("speedtest_monitor.chat_prefs._update_pref") as update:
+        for data in ("pref:lang:ru", "pref:view:detailed"):
+            callback.data = data
+            await notifier._handle_callback(callback)
+
+        assert chat_prefs.get_chat_preferences(42).view_mode == "detailed"
+        await asyncio.sleep(0.05)
+
+        assert chat_prefs._pending_writes == {}
+        prefs = chat_prefs.get_chat_preferences(42)
+        assert (prefs.language, prefs.view_mode) == ("ru", "detailed")
+        update.assert_not_called()
+
+
+def test_render_report_reuses_text_for_unchanged_nodes(mock_config):
+    """Test that a fresh report with the same node states is not re-rendered."""
+    mock_config.status_config = None
+    notifier = TelegramNotifier(mock_config)
+    nodes = [NodeAggregatedStatus(
+        meta=NodeDisplayMeta(node_id="n1", display_name="Node 1", flag="🇩🇪"),
+        last_result=None,
+        is_online=False,
+        derived_status="offline",
+    )]
+
+    with patch.object(
+        MessageFormatter, "format_master_report", wraps=MessageFormatter.format_master_report
+    ) as render:
+        first = notifier._render_report(AggregatedReport(datetime.now(), nodes, {}), "en", "compact")
+        second = notifier._render_report(AggregatedReport(datetime.now(), list(nodes), {}), "en", "compact")
+        notifier._render_report(AggregatedReport(datetime.now(), nodes, {}), "ru", "compact")
+
+    assert first == second
+    assert render.call_count == 2
@@ -0,0 +1,96 @@
+"""
+Tests for utility functions.
+"""
+
+from speedtest_monitor import utils
+from speedtest_monitor.utils import telegram_length, truncate_message
+
+
+def test_truncate_message_short_text_unchanged():
+    """Test that messages within the limit are returned as is."""
+    assert truncate_message("hello", limit=10) == "hello"
+
+
+def test_truncate_message_cuts_at_line_boundary():
+    """Test that truncation keeps whole lines so HTML tags stay balanced."""
+    message = "<b>Header</b>\n<b>Line</b>\n<b>Another line</b>"
+    truncated = truncate_message(message, limit=30)
+
+    assert truncated == "<b>Header</b>\n<b>Line</b>\n…"
+    assert len(truncated) <= 30
+
+
+def test_truncate_message_single_long_line():
+    """Test truncation of a message without newlines."""
+    truncated = truncate_message("x" * 50, limit=10)
+    assert truncated == "x" * 9 + "…"
+
+
+def test_truncate_message_counts_utf16_code_units():
+    """Test that emoji count as two units, as in Telegram's length limit."""
+    message = "🟢 ok\n" * 10
+    assert len(message) <= 50 < telegram_length(message)
+
+    truncated = truncate_message(message, limit=50)
+    assert truncated.endswith("\n…")
+    assert telegram_length(truncated) <= 50
+
+
+def test_ttl_cache_persists_successful_results(tmp_path, monkeypatch):
+    """Test that cached lookups survive a fresh process via the cache file."""
+    monkeypatch.setattr(utils, "LOOKUP_CACHE_PATH", str(tmp_path / "cache.json"))
+    monkeypatch.setattr(utils, "_lookup_cache", None)
+    calls = []
+
+    @utils.ttl_cache(60)
+    def lookup(ip):
+        calls.append(ip)
+        return None if ip == "bad" else f"loc-{ip}"
+
+    assert lookup("1.2.3.4") == "loc-1.2.3.4"
+    assert lookup("1.2.3.4") == "loc-1.2.3.4"
+    assert lookup("bad") is None
+    assert lookup("bad") is None
+    assert calls == ["1.2.3.4", "bad", "bad"]
+
+    # Simulate a new run: memory cache is empty, file is reused
+    monkeypatch.setattr(utils, "_lookup_cache", None)
+    assert lookup("1.2.3.4") == "loc-1.2.3.4"
+    assert calls == ["1.2.3.4", "bad", "bad"]
+
+
+def test_ttl_cache_expires(tmp_path, monkeypatch):
+    """Test that expired entries are looked up again."""
+    monkeypatch.setattr(utils, "LOOKUP_CACHE_PATH", str(tmp_path / "cache.json"))
+    monkeypatch.setattr(utils, "_lookup_cache", None)
+    calls = []
+
+    @utils.ttl_cache(0)
+    def lookup():
+        calls.append(1)
+        return "value"
+
+    lookup()
+    lookup()
+    assert len(calls) == 2
+
+
+def test_ttl_cache_tolerates_bad_cache_file(tmp_path, monkeypatch):
+    """Test that malformed entries and an unknown home directory only cause misses."""
+    cache_path = tmp_path / "cache.json"
+    cache_path.write_text('{"lookup:a": "oops", "lookup:b": [1], "lookup:c": ["x", "soon"]}')
+    monkeypatch.setattr(utils, "LOOKUP_CACHE_PATH", str(cache_path))
+    monkeypatch.setattr(utils, "_lookup_cache", None)
+
+    @utils.ttl_cache(60)
+    def lookup(key):
+        return f"fresh-{key}"
+
+    assert [lookup(k) for k in "abc"] == ["fresh-a", "fresh-b", "fresh-c"]
+
+    def no_home(self):
+        raise RuntimeError("Could not determine home directory.")
+
+    monkeypatch.setattr(utils.Path, "expanduser", no_home)
+    monkeypatch.setattr(utils, "_lookup_cache", None)
+    assert lookup("d") == "fresh-d"